@@ -5,7 +5,7 @@ import argparse
 from importlib.machinery import SourceFileLoader
 from functools import partial
 from random import random
-from math import pi
+from math import pi, sqrt, sin, cos
 
 from PyQt5.QtWidgets import *
 from PyQt5.QtGui import *
@@ -34,6 +34,16 @@ class Canvas(QWidget):
     # the radius around which to check if the node moved when shift-selecting nodes
     mouse_toggle_radius = 0.1
 
+    # if no node moved more than this since the last paint, the canvas is not
+    # repainted (unless something else changed, see repaint_needed)
+    idle_threshold = 1e-3
+
+    # the interval of the simulation timer (in ms), which slows down to idle_interval
+    # once the canvas hasn't been repainted for idle_frames_until_slowdown frames
+    frame_interval = 17
+    idle_interval = 200
+    idle_frames_until_slowdown = 30
+
     def __init__(self, line_edit, parent, update_ui_callback):
         super().__init__(parent)
         # GRAPH
@@ -53,13 +63,83 @@ class Canvas(QWidget):
         self.line_edit = line_edit
         self.line_edit.textEdited.connect(self.line_edit_changed)
 
+        # whether something other than the forces changed since the last repaint
+        self.repaint_needed = True
+
+        # the nodes and their positions at the time of the last repaint
+        self.painted_positions: List[Tuple[DrawableNode, float, float]] = []
+
+        # the number of frames in a row that didn't need to be repainted
+        self.idle_frames = 0
+
         # timer that runs the simulation (60 times a second... once every ~= 17ms)
-        QTimer(self, interval=17, timeout=self.update).start()
+        self.timer = QTimer(self, interval=self.frame_interval, timeout=self.update)
+        self.timer.start()
 
         self.update_ui_callback = update_ui_callback
 
+    def pairwise_forces(
+        self,
+        xs: List[float],
+        ys: List[float],
+        components: List[List[int]],
+        adjacent: Set[Tuple[int, int]],
+    ) -> Tuple[List[float], List[float]]:
+        """Return the x and y components of the repulsion and attraction forces that act
+        on each of the nodes, given their coordinates, components (as lists of indexes)
+        and the (i, j) index pairs of adjacent nodes. Only works with plain floats,
+        lists and sets."""
+        n = len(xs)
+        fxs = [0.0] * n
+        fys = [0.0] * n
+
+        # bind the force functions locally, they're called for each of the pairs
+        repulsion, attraction = self.repulsion, self.attraction
+
+        # for each (unordered) pair of weakly connected nodes -- forces only act within
+        # components, so the other pairs are never even looked at
+        # (the values of the first node are only looked up once for all pairs)
+        for indexes in components:
+            for k, i in enumerate(indexes):
+                xi, yi = xs[i], ys[i]
+
+                for m in range(k + 1, len(indexes)):
+                    j = indexes[m]
+                    dx, dy = xs[j] - xi, ys[j] - yi
+                    d = sqrt(dx * dx + dy * dy)
+
+                    # if they are on top of each other, nudge one of them slightly
+                    if d == 0:
+                        fxs[i] += random()
+                        fys[i] += random()
+                        continue
+
+                    # the size of the repel force between the two nodes
+                    f = repulsion(d)
+
+                    # if they are also connected, add the attraction force
+                    # the direction does not matter -- it would look weird for directed
+                    if (i, j) in adjacent:
+                        f += attraction(d)
+
+                    # add the force to each of the nodes, in the opposite directions
+                    # (along the unit vector from the first node to the second, which
+                    # is folded into the scale, so it's never created)
+                    scale = f / d
+                    fx, fy = dx * scale, dy * scale
+
+                    fxs[i] -= fx
+                    fys[i] -= fy
+                    fxs[j] += fx
+                    fys[j] += fy
+
+        return fxs, fys
+
     def update(self, *args):
         """A function that gets periodically called to update the canvas."""
+        # the list of nodes is only fetched once per frame
+        nodes = self.graph.get_nodes()
+
         # if the graph is rooted and we want to do forces
         root = self.graph.get_root()
         if root is not None and self.forces:
@@ -77,48 +157,30 @@ class Canvas(QWidget):
                     node.add_force(self.tree(vector))
 
             # add gravity
-            for node in self.graph.get_nodes():
+            for node in nodes:
                 if node is not root and self.graph.weakly_connected(node, root):
                     node.add_force(self.gravity())
 
         # only move the nodes when forces are enabled
         if self.forces:
-            for i, n1 in enumerate(self.graph.get_nodes()):
-                for n2 in self.graph.get_nodes()[i + 1 :]:
-                    # only apply force, if n1 and n2 are weakly connected
-                    if not self.graph.weakly_connected(n1, n2):
-                        continue
-
-                    d = n1.get_position().distance(n2.get_position())
-
-                    # if they are on top of each other, nudge one of them slightly
-                    if d == 0:
-                        n1.add_force(Vector(random(), random()))
-                        continue
-
-                    # unit vector from n1 to n2
-                    uv = (n2.get_position() - n1.get_position()).unit()
-
-                    # the size of the repel force between the two nodes
-                    fr = self.repulsion(d)
-
-                    # add a repel force to each of the nodes, in the opposite directions
-                    n1.add_force(-uv * fr)
-                    n2.add_force(uv * fr)
-
-                    # if they are also connected, add the attraction force
-                    # the direction does not matter -- it would look weird for directed
-                    if n1.is_adjacent_to(n2) or n2.is_adjacent_to(n1):
-                        fa = self.attraction(d)
+            # connectivity is cached by the graph, so it's only looked up by indexes
+            components = self.graph.get_component_indexes()
+            adjacent = self.graph.get_adjacent_pairs()
+
+            # gather the positions into flat lists once per frame and sum the forces
+            # as floats, so no vectors are created for each of the pairs
+            fxs, fys = self.pairwise_forces(
+                [node.x for node in nodes],
+                [node.y for node in nodes],
+                components,
+                adjacent,
+            )
 
-                        n1.add_force(-uv * fa)
-                        n2.add_force(uv * fa)
+            for node, fx, fy in zip(nodes, fxs, fys):
+                node.add_force_xy(fx, fy)
 
-                # root is special
-                if n1 is root:
-                    n1.clear_forces()
-                else:
-                    n1.evaluate_forces()
+            # move all of the nodes at once, after the forces were calculated
+            self.graph.evaluate_forces()
 
         # if space is being pressed, center around the currently selected nodes
         # if there are none, center around their average
@@ -135,11 +197,71 @@ class Canvas(QWidget):
 
             if pivot is not None:
                 self.transformation.center(pivot)
+                self.repaint_needed = True
+
+        # only repaint when something changed (nodes moved, animations are playing or
+        # the user did something), since painting is the most expensive part
+        if (
+            self.repaint_needed
+            or self.moved_since_repaint()
+            or self.graph.animations_active()
+        ):
+            super().update(*args)
+
+            self.idle_frames = 0
+            self.__reset_timer_interval()
+        else:
+            self.idle_frames += 1
+
+            # nothing is happening, so the simulation doesn't need to run as often
+            if self.idle_frames == self.idle_frames_until_slowdown:
+                self.timer.setInterval(self.idle_interval)
+
+    def moved_since_repaint(self) -> bool:
+        """Return True if the nodes changed or some of them moved by more than
+        idle_threshold (along any of the axes) since the last repaint."""
+        nodes = self.graph.get_nodes()
+
+        if len(nodes) != len(self.painted_positions):
+            return True
 
-        super().update(*args)
+        for node, (painted, x, y) in zip(nodes, self.painted_positions):
+            if (
+                node is not painted
+                or abs(node.x - x) > self.idle_threshold
+                or abs(node.y - y) > self.idle_threshold
+            ):
+                return True
+
+        return False
+
+    def request_repaint(self, *args):
+        """Let the canvas know that it should repaint in the next frame (for changes
+        to the graph that it doesn't know about, like those done by other widgets)."""
+        self.repaint_needed = True
+
+        self.idle_frames = 0
+        self.__reset_timer_interval()
+
+    def __reset_timer_interval(self):
+        """If the timer slowed down because the canvas was idle, speed it back up (only
+        then, since setting the interval restarts the timer)."""
+        # Qt already sends events to the canvas in __init__, before the timer exists
+        timer = getattr(self, "timer", None)
+
+        if timer is not None and timer.interval() != self.frame_interval:
+            timer.setInterval(self.frame_interval)
+
+    def event(self, event):
+        """Is called with each event the canvas receives (input, resizing, palette
+        changes...), all of which might change what it shows."""
+        self.request_repaint()
+        return super().event(event)
 
     def line_edit_changed(self, text):
         """Called when the line edit associated with the Canvas changed."""
+        self.request_repaint()
+
         selected = self.graph.get_selected_objects()
 
         if type(selected[0]) is DrawableNode:
@@ -170,8 +292,8 @@ class Canvas(QWidget):
         elif len(selected) >= 2 and not (
             type(selected[0]) is DrawableVertex
             and type(selected[1]) is DrawableVertex
-            and selected[0][0] == selected[1][1]
-            and selected[0][1] == selected[1][0]
+            and selected[0].node_from is selected[1].node_to
+            and selected[0].node_to is selected[1].node_from
         ):
             self.line_edit.setReadOnly(True)
             self.line_edit.setText("Select only one node or a vertex to edit.")
@@ -205,8 +327,13 @@ class Canvas(QWidget):
         # draw the graph
         self.graph.draw(painter, palette)
 
+        self.repaint_needed = False
+        self.painted_positions = [(n, n.x, n.y) for n in self.graph.get_nodes()]
+
     def keyReleaseEvent(self, event):
         """Called when a key press is registered."""
+        self.request_repaint()  # also called directly by the main window
+
         key = self.keyboard.released_event(event)
 
         # if we release shift, stop shift-dragging the nodes
@@ -232,6 +359,8 @@ class Canvas(QWidget):
 
     def keyPressEvent(self, event):
         """Called when a key press is registered."""
+        self.request_repaint()  # also called directly by the main window
+
         key = self.keyboard.pressed_event(event)
 
         # toggle graph root on r press
@@ -249,7 +378,7 @@ class Canvas(QWidget):
                 self.graph.remove_node(node)
 
             for vertex in self.graph.get_selected_vertices():
-                self.graph.remove_vertex(vertex[0], vertex[1])
+                self.graph.remove_vertex(vertex.node_from, vertex.node_to)
 
         elif key is self.keyboard.shift and self.mouse.left.pressed():
             self.start_shift_dragging_nodes()
@@ -376,8 +505,15 @@ class Canvas(QWidget):
 
     def rotate_about(self, nodes: Sequence[DrawableNode], angle: float, pivot: Vector):
         """Rotate about the average of selected nodes by the angle."""
+        # the rotation is the same for all of the nodes, so only calculate it once
+        c, s = cos(angle), sin(angle)
+        px, py = pivot
+
         for node in nodes:
-            node.set_position(node.get_position().rotated(angle, pivot), True)
+            x, y = node.get_position()
+            x, y = x - px, y - py
+
+            node.set_position(Vector(x * c - y * s + px, x * s + y * c + py), True)
 
     def select(self, obj: Union[DrawableNode, DrawableVertex]):
         """Select the given node/vertex."""
@@ -426,6 +562,8 @@ class Canvas(QWidget):
                 center_smoothness=1,
             )
 
+            self.request_repaint()
+
         except Exception as e:
             QMessageBox.critical(
                 self, "Error!", "An error occurred when importing the graph."
@@ -475,6 +613,7 @@ class Canvas(QWidget):
                 self, "Error!", f"An error occurred when running the algorithm.\n\n{e}",
             )
 
+        self.request_repaint()
         self.update_ui_callback()
 
 
@@ -638,6 +777,10 @@ class Grafatko(QMainWindow):
         for k, v in widgets.items():
             layout.addWidget(v, *k)
 
+            # the buttons change the graph without the canvas knowing
+            if isinstance(v, QAbstractButton):
+                v.clicked.connect(self.canvas.request_repaint)
+
         self.dock_widget = QWidget()
         self.dock_widget.setLayout(layout)
 
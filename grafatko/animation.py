@@ -111,6 +111,10 @@ class ColorAnimation(Animation, ColorGenerating):
             color_from.blue() * (1 - v) + color_to.blue() * v,
         )
 
+    def is_static(self) -> bool:
+        """The color changes as the animation plays, so it's never static."""
+        return False
+
     def get_start_value(self):
         """Return the start value of the animation."""
         return self.color_from
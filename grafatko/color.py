@@ -3,7 +3,7 @@
 from __future__ import annotations
 from typing import *
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from abc import *
 from PyQt5.QtGui import *
@@ -19,12 +19,18 @@ class ColorGenerating(ABC):
         """Generate the color, given the palette and the color function."""
         pass
 
+    def is_static(self) -> bool:
+        """Return True if the generated color only depends on the palette (and can
+        therefore be reused for the same palette), else False."""
+        return True
+
 
 class Color(ColorGenerating):
     """A class for generating QColors, given a QPalette."""
 
-    def __init__(self, color_function: Callable[[QPalette], QColor]):
+    def __init__(self, color_function: Callable[[QPalette], QColor], static=True):
         self.color_function = color_function
+        self.static = static
 
     @classmethod
     def text(cls) -> Color:
@@ -55,11 +61,17 @@ class Color(ColorGenerating):
 
     def lighter(self, coefficient: float) -> Color:
         """Return a Color object that is lighter than the current one by a coefficient."""
-        return Color(lambda palette: self.color_function(palette).lighter(coefficient))
+        return Color(
+            lambda palette: self.color_function(palette).lighter(coefficient),
+            self.is_static(),
+        )
 
     def darker(self, coefficient: float) -> Color:
         """Return a Color object that is darker than the current one by a coefficient."""
-        return Color(lambda palette: self.color_function(palette).darker(coefficient))
+        return Color(
+            lambda palette: self.color_function(palette).darker(coefficient),
+            self.is_static(),
+        )
 
     @classmethod
     def __contrast(cls, color: QColor) -> QColor:
@@ -70,12 +82,15 @@ class Color(ColorGenerating):
     def contrast(cls, color: Color) -> Color:
         """Return a Color object returning a color from white to black that is in
         contrast to the given color."""
-        return Color(lambda palette: cls.__contrast(color(palette)))
+        return Color(lambda palette: cls.__contrast(color(palette)), color.is_static())
 
     def __call__(self, palette: QPalette) -> QColor:
         """Generated from the simple color function of the class."""
         return self.color_function(palette)
 
+    def is_static(self) -> bool:
+        return self.static
+
 
 @dataclass
 class Colorable:
@@ -83,12 +98,35 @@ class Colorable:
 
     color: ColorGenerating = Color.text()
 
+    # the last generated Qt object, along with the state it was generated for
+    generated: Optional[Tuple[tuple, Any]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
     def set_color(self, color: ColorGenerating):
         self.color = color
 
     def get_color(self) -> ColorGenerating:
         return self.color
 
+    def _generate(
+        self, palette: QPalette, state: tuple, function: Callable[[QColor], Any]
+    ):
+        """Generate a Qt object from the color using the function. The object is reused
+        until the palette, the color or the rest of the state changes (unless the
+        color is not static), since it's generated each time something is drawn."""
+        key = (palette.cacheKey(), self.get_color()) + state
+
+        if self.generated is not None and self.generated[0] == key:
+            return self.generated[1]
+
+        obj = function(self.get_color()(palette))
+
+        if self.get_color().is_static():
+            self.generated = (key, obj)
+
+        return obj
+
 
 @dataclass
 class Pen(Colorable):
@@ -98,7 +136,11 @@ class Pen(Colorable):
     width: float = 0.1
 
     def __call__(self, palette: QPalette):
-        return QPen(self.get_color()(palette), self.width, self.style)
+        return self._generate(
+            palette,
+            (self.width, self.style),
+            lambda color: QPen(color, self.width, self.style),
+        )
 
 
 @dataclass
@@ -108,7 +150,9 @@ class Brush(Colorable):
     style: Qt.BrushStyle = Qt.SolidPattern
 
     def __call__(self, palette: QPalette):
-        return QBrush(self.get_color()(palette), self.style)
+        return self._generate(
+            palette, (self.style,), lambda color: QBrush(color, self.style)
+        )
 
     @classmethod
     def empty(cls):
@@ -4,7 +4,9 @@ from __future__ import annotations
 
 from abc import *
 from ast import literal_eval
-from collections import defaultdict
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from functools import lru_cache
 from math import radians, pi
 
 from grafatko.color import *
@@ -15,10 +17,16 @@ from grafatko.utilities import *
 class Node:
     """A class for working with nodes of a graph."""
 
+    __slots__ = ("adjacent", "label", "_adjacent_nodes")
+
     def __init__(self, label=None):
         self.adjacent: Set[Vertex] = set()
         self.label = label
 
+        # the nodes that the adjacent vertices lead to (mapped to the vertices), for
+        # O(1) adjacency checks and removals
+        self._adjacent_nodes: Dict[Node, Vertex] = {}
+
     def get_label(self) -> Optional[str]:
         """Return the label of the node."""
         return self.label
@@ -36,25 +44,36 @@ class Node:
         return self.adjacent
 
     def get_adjacent_nodes(self) -> Set[Node]:
-        """Returns a list of nodes adjacent to this one."""
-        return {v[1] for v in self.adjacent}
+        """Returns a set of nodes adjacent to this one."""
+        return set(self._adjacent_nodes)
+
+    def iter_adjacent_nodes(self) -> Iterator[Node]:
+        """Returns an iterator over the nodes adjacent to this one (without copying
+        them). The node must not be modified while iterating."""
+        return iter(self._adjacent_nodes)
 
     def is_adjacent_to(self, node: Node) -> bool:
         """Return True if this node is adjacent to the specified node."""
-        return node in self.get_adjacent_nodes()
+        return node in self._adjacent_nodes
 
     def _remove_adjacent_node(self, node: Node):
         """Remove an adjacent node (if it's there)."""
-        self.adjacent = {v for v in self.adjacent if v[1] is not node}
+        vertex = self._adjacent_nodes.pop(node, None)
+
+        if vertex is not None:
+            self.adjacent.discard(vertex)
 
     def _add_adjacent_vertex(self, vertex: Vertex):
         """Add an adjacent vertex."""
         self.adjacent.add(vertex)
+        self._adjacent_nodes[vertex.node_to] = vertex
 
 
 class Vertex:
     """A class for representing a vertex."""
 
+    __slots__ = ("node_from", "node_to", "weight")
+
     def __init__(self, node_from: Node, node_to: Node, weight=1):
         self.node_from = node_from
         self.node_to = node_to
@@ -78,7 +97,7 @@ class Vertex:
 
     def __eq__(self, other: Vertex):
         """Define vertex equality as the equality of both nodes."""
-        return self[0] is other[0] and self[1] is other[1]
+        return self.node_from is other[0] and self.node_to is other[1]
 
     def __hash__(self):
         """The hash is the identity of the object."""
@@ -94,7 +113,7 @@ class Vertex:
 
     def is_loop(self):
         """Return True if the given vertex is a loop."""
-        return self[0] is self[1]
+        return self.node_from is self.node_to
 
 
 class Graph:
@@ -108,12 +127,25 @@ class Graph:
         self.weighted: bool = False
 
         self.nodes: List[Node] = []
-        self.vertices: List[Vertex] = []
+        # the vertices, indexed by their (from, to) nodes, for O(1) lookups/removals
+        # (dictionaries are ordered, so the vertices keep the order they were added in)
+        self.vertices: Dict[Tuple[Node, Node], Vertex] = {}
 
         # a component array that gets recalculated on each destructive graph operation
-        # takes O(n^2) to rebuild, but O(1) to check components, so it's better for us
+        # takes O((V + E) * α(V)) to rebuild (union-find), but O(1) to check components
         self.components: List[Set[Node]] = None
 
+        # the index of the component of each of the nodes, for quick connectivity checks
+        self._component_id: Dict[Node, int] = {}
+
+        # the components and unordered (i < j) pairs of adjacent nodes, by the indexes
+        # of the nodes (so the physics don't need to query the graph for each pair)
+        self._component_indexes: List[List[int]] = []
+        self._adjacent_pairs: Set[Tuple[int, int]] = set()
+
+        # when non-zero, recalculations are postponed (see bulk_update)
+        self._suspend_recompute: int = 0
+
     def recalculate_components(function):
         """A decorator for rebuilding the components of the graph."""
 
@@ -121,45 +153,80 @@ class Graph:
             # first add/remove vertex/node/...
             function(self, *args, **kwargs)
 
-            self.components = []
-
-            for node in self.get_nodes():
-                # the current set of nodes that we know are reachable from one another
-                component = set([node] + list(node.get_adjacent_nodes()))
-
-                i = 0
-                while i < len(self.components):
-                    if len(self.components[i].intersection(component)) != 0:
-                        component |= self.components.pop(i)
-                    else:
-                        i += 1
-
-                self.components.append(component)
+            if not self._suspend_recompute:
+                self._recalculate_components()
 
         return wrapper
 
+    def _recalculate_components(self):
+        """Rebuild the components of the graph, using union-find on its vertices."""
+        nodes = self.get_nodes()
+        index = {node: i for i, node in enumerate(nodes)}
+
+        # union the endpoints of each vertex
+        dsu = DisjointSetUnion(len(nodes))
+        for vertex in self.vertices.values():
+            dsu.union(index[vertex.node_from], index[vertex.node_to])
+
+        # group the nodes (their indexes, in ascending order) by their representatives
+        groups = defaultdict(list)
+        for i in range(len(nodes)):
+            groups[dsu.find(i)].append(i)
+
+        self._component_indexes = list(groups.values())
+        self.components = [{nodes[i] for i in group} for group in groups.values()]
+        self._component_id = {
+            node: i for i, component in enumerate(self.components) for node in component
+        }
+
+        self._adjacent_pairs = {
+            tuple(sorted((index[vertex.node_from], index[vertex.node_to])))
+            for vertex in self.vertices.values()
+        }
+
+    def _recalculate(self):
+        """Recalculate everything that depends on the structure of the graph."""
+        self._recalculate_components()
+
+    @contextmanager
+    def bulk_update(self):
+        """A context manager that postpones the recalculations done after each of the
+        operations inside of it, recalculating only once at the end."""
+        self._suspend_recompute += 1
+
+        try:
+            yield
+        finally:
+            self._suspend_recompute -= 1
+
+            if not self._suspend_recompute:
+                self._recalculate()
+
     def get_weakly_connected(self, *args: Sequence[Node]) -> Set[Node]:
         """Return a set of all nodes that are weakly connected to any node from the
         given sequence."""
         nodes = set()
 
-        for node in args:
-            for component in self.components:
-                if node in component:
-                    nodes |= component
+        # add each of the components only once, even if more of its nodes are given
+        for i in {self._component_id[n] for n in args if n in self._component_id}:
+            nodes |= self.components[i]
 
         return nodes
 
     def weakly_connected(self, n1: Node, n2: Node) -> bool:
         """Return True if the nodes are weakly connected, else False."""
-        for component in self.components:
-            a = n1 in component
-            b = n2 in component
+        i = self._component_id.get(n1)
+        return i is not None and i == self._component_id.get(n2)
 
-            if a and b:
-                return True
-            elif a or b:
-                return False
+    def get_component_indexes(self) -> List[List[int]]:
+        """Return the components of the graph as ascending lists of node indexes (to the
+        list returned by get_nodes)."""
+        return self._component_indexes
+
+    def get_adjacent_pairs(self) -> Set[Tuple[int, int]]:
+        """Return the (i, j) index pairs (i <= j) of nodes connected by a vertex in any
+        of the directions (indexes are to the list returned by get_nodes)."""
+        return self._adjacent_pairs
 
     def is_directed(self) -> bool:
         """Return True if the graph is directed, else False."""
@@ -169,18 +236,19 @@ class Graph:
         """Set, whether the graph is directed or not."""
         # if we're converting to undirected, make all current vertices go both ways
         if self.is_directed():
-            for node in self.get_nodes():
-                for neighbour in node.get_adjacent_nodes():
-                    if node is neighbour:
-                        self.remove_vertex(node, neighbour)  # no loops allowed >:C
-                    else:
-                        self.add_vertex(neighbour, node)
+            with self.bulk_update():
+                for node in self.get_nodes():
+                    for neighbour in node.get_adjacent_nodes():
+                        if node is neighbour:
+                            self.remove_vertex(node, neighbour)  # no loops allowed >:C
+                        else:
+                            self.add_vertex(neighbour, node)
 
             # also, set all weights between to nodes to equal
             for v1 in self.get_vertices():
-                for v2 in self.get_vertices():
-                    if v1 == (v2[1], v2[0]):
-                        v2.set_weight(v1.get_weight())
+                v2 = self.get_vertex(v1.node_to, v1.node_from)
+                if v2 is not None:
+                    v2.set_weight(v1.get_weight())
 
         self.directed = directed
 
@@ -199,16 +267,19 @@ class Graph:
 
         if not self.is_directed():
             # find the vertex that goes the other way
-            for v in self.get_vertices():
-                if v == (vertex[1], vertex[0]):
-                    v.set_weight(weight)
-                    break
+            v = self.get_vertex(vertex.node_to, vertex.node_from)
+            if v is not None:
+                v.set_weight(weight)
+
+    def get_vertex(self, n1: Node, n2: Node) -> Optional[Vertex]:
+        """Return the vertex from n1 to n2 (and None if they're not connected)."""
+        return self.vertices.get((n1, n2))
 
     def get_weight(self, n1: Node, n2: Node) -> Optional[Union[int, float]]:
         """Return the weight of the specified vertex (and None if they're not connected)."""
-        for vertex in self.get_vertices():
-            if Vertex(n1, n2) == vertex:
-                return vertex.get_weight()
+        vertex = self.get_vertex(n1, n2)
+        if vertex is not None:
+            return vertex.get_weight()
 
     def get_nodes(self) -> List[Node]:
         """Return a list of nodes of the graph."""
@@ -216,7 +287,7 @@ class Graph:
 
     def get_vertices(self) -> List[Vertex]:
         """Return a list of vertices of the graph."""
-        return self.vertices
+        return list(self.vertices.values())
 
     @recalculate_components
     def add_node(self, node: Node):
@@ -225,26 +296,36 @@ class Graph:
 
     def reorient(self):
         """Change the orientation of all vertices."""
-        # for each pair of nodes
-        for i, n1 in enumerate(self.get_nodes()):
-            for n2 in self.get_nodes()[i:]:
-                # change the direction, if there is only one
-                if bool(n1.is_adjacent_to(n2)) != bool(n2.is_adjacent_to(n1)):  # xor
-                    self.toggle_vertex(n1, n2)
-                    self.toggle_vertex(n2, n1)
+        # the vertices that only go one way (the others stay the same when reoriented)
+        one_way = [
+            v for v in self.get_vertices() if not v.node_to.is_adjacent_to(v.node_from)
+        ]
+
+        with self.bulk_update():
+            for vertex in one_way:
+                self.remove_vertex(vertex.node_from, vertex.node_to)
+                self.add_vertex(vertex.node_to, vertex.node_from, vertex.get_weight())
 
     def complement(self):
         """Complement the graph."""
-        # for each pair of nodes
-        for i, n1 in enumerate(self.get_nodes()):
-            for n2 in self.get_nodes()[i:]:
-                self.toggle_vertex(n1, n2)
-
-                # also toggle the other way, if it's directed
-                # node that I didn't deliberately put 'and n1 is not n2' here, since
-                # they're special and we usually don't want them
-                if self.is_directed():
-                    self.toggle_vertex(n2, n1)
+        nodes = self.get_nodes()
+
+        # the adjacent nodes before complementing, since the graph changes as we go
+        adjacent = {node: node.get_adjacent_nodes() for node in nodes}
+
+        with self.bulk_update():
+            for n1 in nodes:
+                for n2 in nodes:
+                    # loops are special and we usually don't want them, so they're kept
+                    # as they are (for undirected graphs, the other direction is toggled
+                    # by add_vertex/remove_vertex, so the second call does nothing)
+                    if n1 is n2:
+                        continue
+
+                    if n2 in adjacent[n1]:
+                        self.remove_vertex(n1, n2)
+                    else:
+                        self.add_vertex(n1, n2)
 
     @recalculate_components
     def remove_node(self, node: Node):
@@ -252,18 +333,15 @@ class Graph:
         # remove it from the list of nodes
         self.nodes.remove(node)
 
-        # remove all vertices that contain it
-        i = 0
-        while i < len(self.vertices):
-            v = self.vertices[i]
-            if node is v[0] or node is v[1]:
-                del self.vertices[i]
-            else:
-                i += 1
+        # remove all vertices that go from it
+        for other in node.iter_adjacent_nodes():
+            del self.vertices[(node, other)]
 
-        # remove this node from all nodes' adjacent
+        # remove all vertices that go to it (removing it from all nodes' adjacent)
         for other in self.get_nodes():
-            other._remove_adjacent_node(node)
+            if other.is_adjacent_to(node):
+                del self.vertices[(other, node)]
+                other._remove_adjacent_node(node)
 
     @recalculate_components
     def add_vertex(self, n1: Node, n2: Node, weight: Optional[float] = 1, **kwargs):
@@ -276,13 +354,13 @@ class Graph:
 
         # create the object, adding it to vertices
         vertex = self.vertex_class(n1, n2, weight, **kwargs)
-        self.vertices.append(vertex)
+        self.vertices[(n1, n2)] = vertex
         n1._add_adjacent_vertex(vertex)
 
         # add it one/both ways, depending on whether the graph is directed or not
         if not self.is_directed():
             vertex = self.vertex_class(n2, n1, weight, **kwargs)
-            self.vertices.append(vertex)
+            self.vertices[(n2, n1)] = vertex
             n2._add_adjacent_vertex(vertex)
 
     @recalculate_components
@@ -290,17 +368,11 @@ class Graph:
         """Removes a vertex from node n1 to node n2 (and vice versa, if it's not 
         directed). Only does so if the given vertex exists."""
         # remove it one-way if the graph is directed and both if it's not
-        i = 0
-        while i < len(self.vertices):
-            v = self.vertices[i]
-            if (n1, n2) == v or (not self.is_directed() and (n2, n1) == v):
-                del self.vertices[i]
-            else:
-                i += 1
-
-        # see above comment
+        self.vertices.pop((n1, n2), None)
         n1._remove_adjacent_node(n2)
+
         if not self.is_directed():
+            self.vertices.pop((n2, n1), None)
             n2._remove_adjacent_node(n1)
 
     def toggle_vertex(self, n1: Node, n2: Node):
@@ -313,111 +385,122 @@ class Graph:
     @classmethod
     def from_string(cls, string: str, *args, **kwargs) -> type(cls):
         """Generates the graph from a given string."""
-        graph = None
         node_dictionary = {}
 
-        # add each of the nodes of the given line to the graph
-        for line in filter(lambda x: len(x) != 0, string.splitlines()):
-            parts = line.strip().split()
-
-            # initialize the graph from the first line (if it hasn't been done yet)
-            if graph is None:
-                directed = parts[1] in ("->", "<-")
-                weighted = len(parts) == 3 + directed
-
-                graph = cls(*args, **kwargs)
-                graph.set_directed(directed)
-                graph.set_weighted(weighted)
-
-            # the formats are either 'A B' or 'A <something> B'
-            node_names = (parts[0], parts[1 + directed])
-
-            # if weight is present, the formats are:
-            # - 'A B num' for undirected graphs
-            # - 'A <something> B num' for directed graphs
-            weight = 0 if not weighted else literal_eval(parts[2 + directed])
-
-            # create node objects for each of the names (if it hasn't been done yet)
-            for name in node_names:
-                if name not in node_dictionary:
-                    # add it to graph with default values
-                    node_dictionary[name] = cls.node_class(label=name)
-                    graph.add_node(node_dictionary[name])
-
-            # get the node objects from the names
-            n1, n2 = node_dictionary[node_names[0]], node_dictionary[node_names[1]]
-
-            # possibly switch places for a reverse arrow
-            if parts[1] == "<-":
-                n1, n2 = n2, n1
-
-            # add the vertex
-            graph.add_vertex(n1, n2, weight)
+        # the parts of each of the lines (skipping empty ones and comments)
+        lines = [
+            parts
+            for parts in map(str.split, string.splitlines())
+            if len(parts) != 0 and not parts[0].startswith("#")
+        ]
+
+        if len(lines) == 0:
+            return None
+
+        # initialize the graph from the first line
+        directed = lines[0][1] in ("->", "<-")
+        weighted = len(lines[0]) == 3 + directed
+
+        graph = cls(*args, **kwargs)
+        graph.set_directed(directed)
+        graph.set_weighted(weighted)
+
+        # add each of the nodes of the given line to the graph (recalculating only
+        # once, after everything has been added)
+        with graph.bulk_update():
+            for parts in lines:
+                # the formats are either 'A B' or 'A <something> B'
+                node_names = (parts[0], parts[1 + directed])
+
+                # if weight is present, the formats are:
+                # - 'A B num' for undirected graphs
+                # - 'A <something> B num' for directed graphs
+                weight = 0 if not weighted else literal_eval(parts[2 + directed])
+
+                # create node objects for each of the names (if it hasn't been done yet)
+                for name in node_names:
+                    if name not in node_dictionary:
+                        # add it to graph with default values
+                        node_dictionary[name] = cls.node_class(label=name)
+                        graph.add_node(node_dictionary[name])
+
+                # get the node objects from the names
+                n1, n2 = node_dictionary[node_names[0]], node_dictionary[node_names[1]]
+
+                # possibly switch places for a reverse arrow
+                if parts[1] == "<-":
+                    n1, n2 = n2, n1
+
+                # add the vertex
+                graph.add_vertex(n1, n2, weight)
 
         return graph
 
     def to_string(self) -> str:
         """Exports the graph, returning the string."""
-        string = ""
+        lines = []
 
         counter = 0  # for naming nodes that don't have a label
-        added = {}
+        labels = {}
+
+        # the positions of the nodes in the graph, for a stable order of vertex nodes
+        index = {node: i for i, node in enumerate(self.get_nodes())}
 
         # for each vertex
         for vertex in self.get_vertices():
-            n1 = vertex[0]
-            n2 = vertex[1]
+            n1 = vertex.node_from
+            n2 = vertex.node_to
 
             # only add a vertex from an undirected graph once
-            if not self.is_directed() and id(n1) > id(n2):
+            if not self.is_directed() and index[n1] > index[n2]:
                 continue
 
-            n1_label = n1.get_label()
-            if n1_label is None:
-                if n1 not in added:
-                    counter += 1
-                    added[n1] = str(counter)
-                n1_label = added[n1]
-
-            n2_label = n2.get_label()
-            if n2_label is None:
-                if n2 not in added:
-                    counter += 1
-                    added[n2] = str(counter)
-                n2_label = added[n2]
-
-            if n1.is_adjacent_to(n2):
-                string += (
-                    n1_label
-                    + (" -> " if self.is_directed() else " ")
-                    + n2_label
-                    + (
-                        (" " + str(self.get_weight(n1, n2)))
-                        if self.is_weighted()
-                        else ""
-                    )
-                    + "\n"
-                )
-
-            if n2.is_adjacent_to(n1) and self.is_directed():
-                string += (
-                    n1_label
-                    + (" <- " if self.is_directed() else " ")
-                    + n2_label
-                    + (
-                        (" " + str(self.get_weight(n2, n1)))
-                        if self.is_weighted()
-                        else ""
-                    )
-                    + "\n"
-                )
-
-        return string
+            for node in (n1, n2):
+                if node not in labels:
+                    if node.get_label() is None:
+                        counter += 1
+                        labels[node] = str(counter)
+                    else:
+                        labels[node] = node.get_label()
+
+            lines.append(
+                labels[n1]
+                + (" -> " if self.is_directed() else " ")
+                + labels[n2]
+                + ((" " + str(vertex.get_weight())) if self.is_weighted() else "")
+                + "\n"
+            )
+
+        return "".join(lines)
+
+
+# copies of the fonts that text was measured in, by their keys
+_fonts: Dict[str, QFont] = {}
+
+
+def text_size(font: QFont, text: str) -> Tuple[int, int]:
+    """Return the width and the height of the rectangle that bounds the text when it's
+    drawn in the given font. The results are cached, since they rarely change."""
+    key = font.key()
+
+    if key not in _fonts:
+        _fonts[key] = QFont(font)
+
+    return _text_size(key, text)
+
+
+@lru_cache(maxsize=4096)
+def _text_size(font_key: str, text: str) -> Tuple[int, int]:
+    """Measure the text in the font with the given key (see text_size)."""
+    r = QFontMetrics(_fonts[font_key]).boundingRect(text)
+    return r.width(), r.height()
 
 
 class Drawable(ABC):
     """Something that can be drawn on the PyQt5 canvas."""
 
+    __slots__ = ()
+
     @abstractmethod
     def draw(self, painter: QPainter, palette: QPalette, *args, **kwargs):
         """Draws the object on the canvas. Takes the painter to paint on and the palette
@@ -428,6 +511,10 @@ class Drawable(ABC):
 class Paintable:
     """Has a brush and a pen to be drawn on the painter."""
 
+    # the attributes are stored in the slots of the inheriting class, since only one
+    # of the (multiple) base classes can have non-empty slots
+    __slots__ = ()
+
     def __init__(self, pen: Pen = None, brush: Brush = None):
         self.pen = pen or Pen()
         self.brush = brush or Brush()
@@ -451,6 +538,9 @@ class Paintable:
 class Selectable:
     """Something that can be selected."""
 
+    # see Paintable
+    __slots__ = ()
+
     def __init__(self):
         self.selected = False
 
@@ -471,10 +561,17 @@ class Selectable:
 
 
 class DrawableNode(Drawable, Paintable, Selectable, Node):
+    __slots__ = (
+        "_position", "x", "y", "_fx", "_fy", "drag", "pen", "brush", "selected"
+    )
+
     def __init__(self, *args, position=Vector(0, 0), **kwargs):
         self.position: Vector = position
 
-        self.forces: List[Vector] = []
+        # the sum of the forces acting upon the node (until they're evaluated)
+        # kept as two floats, so adding a force doesn't allocate a new vector
+        self._fx: float = 0.0
+        self._fy: float = 0.0
 
         # for information about being dragged
         # at that point, no forces act on it
@@ -491,6 +588,17 @@ class DrawableNode(Drawable, Paintable, Selectable, Node):
     def get_color(self) -> ColorGenerating:
         return self.brush.get_color()
 
+    @property
+    def position(self) -> Vector:
+        """The position of the node (its x and y are also available directly)."""
+        return self._position
+
+    @position.setter
+    def position(self, position: Vector):
+        # the components are also kept as plain floats, for the physics to read directly
+        self._position = position
+        self.x, self.y = position
+
     def get_position(self) -> Vector:
         """Return the position of the node."""
         return self.position
@@ -516,21 +624,27 @@ class DrawableNode(Drawable, Paintable, Selectable, Node):
         return self.drag is not None
 
     def add_force(self, force: Vector):
-        """Adds a force that is acting upon the node to the force list."""
-        self.forces.append(force)
+        """Adds a force that is acting upon the node to the sum of its forces."""
+        fx, fy = force
+        self._fx += fx
+        self._fy += fy
+
+    def add_force_xy(self, fx: float, fy: float):
+        """Adds a force, given by its components, to the sum of the node's forces."""
+        self._fx += fx
+        self._fy += fy
 
     def evaluate_forces(self):
         """Evaluates all of the forces acting upon the node and moves it accordingly.
         Node that they are only applied if the note is not being dragged."""
-        while len(self.forces) != 0:
-            force = self.forces.pop()
+        if not self.is_dragged():
+            self.position = Vector(self.x + self._fx, self.y + self._fy)
 
-            if not self.is_dragged():
-                self.position += force
+        self.clear_forces()
 
     def clear_forces(self):
         """Clear all of the forces from the node."""
-        self.forces = []
+        self._fx = self._fy = 0.0
 
     def draw(self, painter: QPainter, palette: QPalette, draw_label=False):
         painter.setBrush(self.brush(palette))
@@ -549,11 +663,11 @@ class DrawableNode(Drawable, Paintable, Selectable, Node):
         mid = self.get_position()
 
         # get the rectangle that surrounds the label
-        r = QFontMetrics(painter.font()).boundingRect(label)
-        scale = 1.9 / Vector(r.width(), r.height()).magnitude()
+        width, height = text_size(painter.font(), label)
+        scale = 1.9 / Vector(width, height).magnitude()
 
         # draw it on the screen
-        size = Vector(r.width(), r.height()) * scale
+        size = Vector(width, height) * scale
         rect = QRectF(*(mid - size / 2), *size)
 
         painter.save()
@@ -580,9 +694,18 @@ class DrawableVertex(Drawable, Paintable, Selectable, Vertex):
 
     text_scale: Final[float] = 0.04  # the constant by which to scale down the font
 
+    __slots__ = ("font", "pen", "brush", "selected", "tip_brush", "_position")
+
     def __init__(self, *args, **kwargs):
         self.font: QFont = None  # the font that is used to draw the weights
 
+        # the brush of the tip of the arrow (which has the color of the pen)
+        self.tip_brush: Brush = Brush()
+
+        # the last calculated starting and ending position of the vertex, along with
+        # the state of the nodes it was calculated for (see __get_position)
+        self._position: Optional[Tuple[tuple, Tuple[Vector, Vector]]] = None
+
         Paintable.__init__(self)
         Selectable.__init__(self)
         Vertex.__init__(self, *args, **kwargs)
@@ -601,7 +724,7 @@ class DrawableVertex(Drawable, Paintable, Selectable, Vertex):
             painter.setBrush(Brush.empty()(palette))
 
             # draw the ellipse that symbolizes a loop
-            center = self[0].get_position() - Vector(0.5, 1)
+            center = self.node_from.get_position() - Vector(0.5, 1)
             painter.drawEllipse(QPointF(*center), 0.5, 0.5)
 
             # draw the head of the loop arrow
@@ -651,8 +774,7 @@ class DrawableVertex(Drawable, Paintable, Selectable, Vertex):
     def _get_weight_box(self, directed) -> QRectF:
         """Get the rectangle that the weight of n1->n2 vertex will be drawn in."""
         # get the rectangle that bounds the text (according to the current font metric)
-        metrics = QFontMetrics(self.font)
-        r = metrics.boundingRect(str(self.get_weight()))
+        width, height = text_size(self.font, str(self.get_weight()))
 
         # get the mid point of the weight box, depending on whether it's a loop or not
         if self.is_loop():
@@ -665,8 +787,7 @@ class DrawableVertex(Drawable, Paintable, Selectable, Vertex):
 
         # scale it down by text_scale before returning it
         # if width is smaller then height, set it to height
-        height = r.height()
-        width = r.width() if r.width() >= height else height
+        width = max(width, height)
 
         size = Vector(width, height) * self.text_scale
         return QRectF(*(mid - size / 2), *size)
@@ -678,7 +799,8 @@ class DrawableVertex(Drawable, Paintable, Selectable, Vertex):
         uv = direction.unit()
 
         # the brush color is given by the current pen
-        painter.setBrush(Brush(self.pen.get_color())(palette))
+        self.tip_brush.set_color(self.pen.get_color())
+        painter.setBrush(self.tip_brush(palette))
         painter.drawPolygon(
             QPointF(*position),
             QPointF(*(position + (-uv).rotated(radians(30)) * self.arrowhead_size)),
@@ -689,12 +811,28 @@ class DrawableVertex(Drawable, Paintable, Selectable, Vertex):
         """Return the starting and ending position of the vertex on the screen."""
         # special case for a loop
         if self.is_loop():
-            return (self[0].get_position(), self[1].get_position())
+            return (self.node_from.get_position(), self.node_to.get_position())
 
         # positions of the nodes
-        from_pos = Vector(*self[0].get_position())
-        to_pos = Vector(*self[1].get_position())
+        from_pos = self.node_from.get_position()
+        to_pos = self.node_to.get_position()
+
+        # if a vertex exists that goes the other way, the vertex is drawn differently
+        two_way = directed and self.node_to.is_adjacent_to(self.node_from)
+
+        # the position only changes when the nodes move (which they don't always do),
+        # but it's needed each time the vertex is drawn or checked for mouse clicks
+        state = (from_pos, to_pos, two_way)
+        if self._position is not None and self._position[0] == state:
+            return self._position[1]
+
+        self._position = (state, self.__calculate_position(from_pos, to_pos, two_way))
+        return self._position[1]
 
+    def __calculate_position(
+        self, from_pos: Vector, to_pos: Vector, two_way: bool
+    ) -> Tuple[Vector, Vector]:
+        """Calculate the starting and ending position of a (non-loop) vertex."""
         if to_pos == from_pos:
             return to_pos, to_pos
 
@@ -707,7 +845,7 @@ class DrawableVertex(Drawable, Paintable, Selectable, Vertex):
 
         # if the graph is directed and a vertex exists that goes the other way, we
         # have to move the start end end so the vertexes don't overlap
-        if directed and self[1].is_adjacent_to(self[0]):
+        if two_way:
             start = start.rotated(self.arrow_separation, from_pos)
             end = end.rotated(-self.arrow_separation, to_pos)
 
@@ -856,31 +994,38 @@ class DrawableGraph(Drawable, Graph):
             # first add/remove vertex/node/whatever
             function(self, *args, **kwargs)
 
-            self.distance_from_root = {}
+            if not self._suspend_recompute:
+                self._recalculate_distance_to_root()
 
-            # don't do anything if the root
-            if self.get_root() is None:
-                return
+        return wrapper
+
+    def _recalculate_distance_to_root(self):
+        """Recalculate the distance from the root node to the rest of the graph."""
+        self.distance_from_root = defaultdict(list)
 
-            # else run the BFS to calculate the distances
-            queue = [(self.root, 1)]
-            closed = set()
-            self.distance_from_root[0] = [self.root]
+        # don't do anything if the root
+        if self.get_root() is None:
+            return
 
-            while len(queue) != 0:
-                current, distance = queue.pop(0)
+        # else run the BFS to calculate the distances
+        queue = deque([(self.root, 1)])
+        closed = {self.root}
+        self.distance_from_root[0].append(self.root)
 
-                for adjacent in current.get_adjacent_nodes():
-                    if adjacent not in closed:
-                        if distance not in self.distance_from_root:
-                            self.distance_from_root[distance] = []
+        while len(queue) != 0:
+            current, distance = queue.popleft()
 
-                        queue.append((adjacent, distance + 1))
-                        self.distance_from_root[distance].append(adjacent)
+            for adjacent in current.iter_adjacent_nodes():
+                # mark the nodes when they're found, so they're only queued once
+                if adjacent not in closed:
+                    closed.add(adjacent)
 
-                closed.add(current)
+                    queue.append((adjacent, distance + 1))
+                    self.distance_from_root[distance].append(adjacent)
 
-        return wrapper
+    def _recalculate(self):
+        super()._recalculate()
+        self._recalculate_distance_to_root()
 
     @recalculate_distance_to_root
     def set_root(self, node: DrawableNode):
@@ -911,6 +1056,15 @@ class DrawableGraph(Drawable, Graph):
 
         super().remove_node(node, **kwargs)
 
+    def evaluate_forces(self):
+        """Move all nodes by the forces that act upon them (in a single step, after all
+        of the forces were added). The root of the graph doesn't move."""
+        for node in self.get_nodes():
+            if node is self.root:
+                node.clear_forces()
+            else:
+                node.evaluate_forces()
+
     def deselect_all(self):
         """Deselect all nodes and vertices."""
         for node in self.get_nodes():
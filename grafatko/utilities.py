@@ -3,20 +3,44 @@
 from __future__ import annotations
 from typing import *
 
-from math import sqrt, sin, cos
+from math import sqrt, sin, cos, hypot
 from dataclasses import *
 
 
 Number = Union[int, float, complex]
 
+# the types that multiply a vector as a scalar (checked with isinstance)
+_NUMERIC = (int, float, complex)
+
 class Vector:
     """A Python implementation of a vector class and some of its operations."""
 
-    values: List[Number] = None
+    __slots__ = ("values",)
+
+    def __new__(cls, *args):
+        # two-dimensional vectors (almost all of them) get the specialized class
+        # (built right here, since its __init__ does nothing)
+        if cls is Vector and len(args) == 2:
+            vector = object.__new__(Vector2)
+            vector.x, vector.y = args
+            return vector
+
+        return object.__new__(cls)
 
     def __init__(self, *args):
         self.values = list(args)
 
+    @classmethod
+    def _new(cls, values: List[Number]) -> Vector:
+        """Create a vector directly from a list of its components (taking ownership of
+        the list), skipping the unpacking and copying done by the constructor."""
+        if len(values) == 2:
+            return Vector2(*values)
+
+        vector = object.__new__(Vector)
+        vector.values = values
+        return vector
+
     def __str__(self):
         """String representation of a vector is its components surrounded by < and >."""
         return f"<{str(self.values)[1:-1]}>"
@@ -26,6 +50,10 @@ class Vector:
     def __len__(self):
         return len(self.values)
 
+    def __iter__(self):
+        """Iterate the components directly (instead of indexing until IndexError)."""
+        return iter(self.values)
+
     def __hash__(self):
         """Defines the hash of the vector as a hash of a tuple with its components."""
         return hash(tuple(self))
@@ -40,52 +68,52 @@ class Vector:
         return self.values[i]
 
     def __neg__(self):
-        return Vector(*iter(-component for component in self))
+        return Vector._new([-component for component in self.values])
 
     def __add__(self, other: Vector):
-        return Vector(*iter(u + v for u, v in zip(self, other)))
+        return Vector._new([u + v for u, v in zip(self.values, other)])
 
     __iadd__ = __add__
 
     def __sub__(self, other: Vector):
-        return self + (-other)
+        return Vector._new([u - v for u, v in zip(self.values, other)])
 
     __isub__ = __sub__
 
     def __mul__(self, other: Vector):
         """Defines scalar and dot product of a vector."""
-        if type(other) in (int, float, complex):
-            return Vector(*iter(component * other for component in self))
+        if isinstance(other, _NUMERIC):
+            return Vector._new([component * other for component in self.values])
         else:
-            return sum(u * v for u, v in zip(self, other))
+            return sum(u * v for u, v in zip(self.values, other))
 
     __rmul__ = __imul__ = __mul__
 
     def __truediv__(self, other: Number):
         """Defines vector division by a scalar."""
-        return Vector(*iter(component / other for component in self))
+        return Vector._new([component / other for component in self.values])
 
     def __floordiv__(self, other: Number):
         """Defines floor vector division by a scalar."""
-        return Vector(*iter(component // other for component in self))
+        return Vector._new([component // other for component in self.values])
 
     def magnitude(self):
         """Returns the magnitude of the vector."""
-        return sqrt(sum(component ** 2 for component in self))
+        return sqrt(sum(component * component for component in self.values))
 
     def rotated(self, angle: float, point: Vector = None):
         """Returns this vector rotated by an angle (in radians) around a certain point."""
-        if point is None:
-            point = Vector(0, 0)
+        px, py = (0, 0) if point is None else point
 
-        return self.__rotated(angle, self - point) + point
+        # rotate the components relative to the point, creating only the result vector
+        x, y = self.__rotated(angle, self.values[0] - px, self.values[1] - py)
 
-    def __rotated(self, angle: float, vector: Vector):
-        """Returns a vector rotated by an angle (in radians)."""
-        return Vector(
-            vector[0] * cos(angle) - vector[1] * sin(angle),
-            vector[0] * sin(angle) + vector[1] * cos(angle),
-        )
+        return Vector(x + px, y + py)
+
+    def __rotated(self, angle: float, x: Number, y: Number) -> Tuple[Number, Number]:
+        """Returns the components of a vector rotated by an angle (in radians)."""
+        c, s = cos(angle), sin(angle)
+        return x * c - y * s, x * s + y * c
 
     def unit(self):
         """Returns a unit vector with the same direction as this vector."""
@@ -93,16 +121,20 @@ class Vector:
 
     def distance(self, other: Vector):
         """Returns the distance of two Vectors in space."""
-        return sqrt(sum(map(lambda x: sum(x) ** 2, zip(self, -other))))
+        return sqrt(sum((u - v) ** 2 for u, v in zip(self.values, other)))
 
     def repeat(self, n: int):
         """Performs sequence repetition on the vector (n times)."""
-        return Vector(*self.values * n)
+        return Vector._new(self.values * n)
 
     @classmethod
     def sum(cls, l: List[Vector]):
         """Return the sum of the given vectors."""
-        return sum(l[1:], l[0])
+        if len(l) == 0:
+            raise IndexError("can't sum an empty list of vectors")
+
+        # sum each of the components at once, instead of adding the vectors one by one
+        return Vector._new([sum(components) for components in zip(*l)])
 
     @classmethod
     def average(cls, l: List[Vector]):
@@ -110,6 +142,139 @@ class Vector:
         return Vector.sum(l) / len(l)
 
 
+class Vector2(Vector):
+    """A two-dimensional vector, storing its components as plain attributes so the
+    arithmetic doesn't have to loop over them."""
+
+    __slots__ = ("x", "y")
+
+    def __new__(cls, x: Number, y: Number):
+        # the components are set here and __init__ is a no-op, so constructing the
+        # vector is a single Python-level call
+        vector = object.__new__(cls)
+        vector.x = x
+        vector.y = y
+        return vector
+
+    __init__ = object.__init__
+
+    def __reduce__(self):
+        """Copy and pickle the vector through __new__ (its inherited values slot is
+        unused, so the default slot-by-slot state can't be restored)."""
+        return Vector2, (self.x, self.y)
+
+    @property
+    def values(self) -> List[Number]:
+        """A new list with the components (a snapshot: changing it doesn't change the
+        vector, which is what indexing is for)."""
+        return [self.x, self.y]
+
+    def __len__(self):
+        return 2
+
+    def __iter__(self):
+        return iter((self.x, self.y))
+
+    def __eq__(self, other: Vector):
+        # compare the components directly, since positions are compared every frame
+        if isinstance(other, Vector2):
+            return self.x == other.x and self.y == other.y
+
+        return len(other) == 2 and self.x == other[0] and self.y == other[1]
+
+    __hash__ = Vector.__hash__
+
+    def __setitem__(self, i: int, value: Number):
+        if i in (0, -2):
+            self.x = value
+        elif i in (1, -1):
+            self.y = value
+        else:
+            raise IndexError("vector index out of range")
+
+    def __getitem__(self, i: int):
+        return (self.x, self.y)[i]
+
+    def __neg__(self):
+        return Vector2(-self.x, -self.y)
+
+    def __add__(self, other: Vector):
+        ox, oy = other
+        return Vector2(self.x + ox, self.y + oy)
+
+    __iadd__ = __add__
+
+    def __sub__(self, other: Vector):
+        ox, oy = other
+        return Vector2(self.x - ox, self.y - oy)
+
+    __isub__ = __sub__
+
+    def __mul__(self, other: Vector):
+        """Defines scalar and dot product of a vector."""
+        if isinstance(other, _NUMERIC):
+            return Vector2(self.x * other, self.y * other)
+        else:
+            ox, oy = other
+            return self.x * ox + self.y * oy
+
+    __rmul__ = __imul__ = __mul__
+
+    def __truediv__(self, other: Number):
+        """Defines vector division by a scalar."""
+        return Vector2(self.x / other, self.y / other)
+
+    def __floordiv__(self, other: Number):
+        """Defines floor vector division by a scalar."""
+        return Vector2(self.x // other, self.y // other)
+
+    def magnitude(self):
+        """Returns the magnitude of the vector."""
+        return hypot(self.x, self.y)
+
+    def distance(self, other: Vector):
+        """Returns the distance of two Vectors in space."""
+        ox, oy = other
+        return hypot(self.x - ox, self.y - oy)
+
+
+class DisjointSetUnion:
+    """A disjoint-set (union-find) structure over the integers 0..n-1, with path
+    compression and union by rank."""
+
+    def __init__(self, n: int):
+        self.parent: List[int] = list(range(n))
+        self.rank: List[int] = [0] * n
+
+    def find(self, i: int) -> int:
+        """Return the representative of the set containing i."""
+        root = i
+        while self.parent[root] != root:
+            root = self.parent[root]
+
+        # compress the path, so the next find is (almost) immediate
+        while self.parent[i] != root:
+            self.parent[i], i = root, self.parent[i]
+
+        return root
+
+    def union(self, i: int, j: int):
+        """Merge the sets containing i and j."""
+        a, b = self.find(i), self.find(j)
+
+        if a == b:
+            return
+
+        # attach the shallower tree under the deeper one
+        if self.rank[a] < self.rank[b]:
+            a, b = b, a
+
+        self.parent[b] = a
+
+        if self.rank[a] == self.rank[b]:
+            self.rank[a] += 1
+
+
 @dataclass
 class Transformation:
     """A class for working with the current transformation of the canvas."""
@@ -117,31 +282,40 @@ class Transformation:
     canvas: QWidget  # get the widget so we can calculate the current width and height
 
     # initial scale and transformation
+    # (the translation is stored as two floats, so it can be changed in place)
     scale: float = 20
-    translation: float = Vector(0, 0)
+    tx: float = 0
+    ty: float = 0
 
     def transform_painter(self, painter: QPainter):
         """Translate the painter according to the current canvas state."""
-        painter.translate(*self.translation)
+        painter.translate(self.tx, self.ty)
         painter.scale(self.scale, self.scale)
 
     def apply(self, point: Vector):
         """Apply the current canvas transformation on the point."""
-        return (point - self.translation) / self.scale
+        x, y = point
+        return Vector((x - self.tx) / self.scale, (y - self.ty) / self.scale)
 
     def inverse(self, point: Vector):
         """The inverse of apply."""
-        return point * self.scale + self.translation
+        x, y = point
+        return Vector(x * self.scale + self.tx, y * self.scale + self.ty)
 
     def center(self, point: Vector, center_smoothness: float = 0.3):
         """Center the transformation on the given point. The closer to 1 the value of
         center_smoothness, the faster the centering is."""
-        middle = self.apply(Vector(self.canvas.width(), self.canvas.height()) / 2)
-        self.translation = self.inverse((middle - point) * center_smoothness)
+        mx, my = self.apply(Vector(self.canvas.width(), self.canvas.height()) / 2)
+        x, y = point
+
+        self.tx += (mx - x) * center_smoothness * self.scale
+        self.ty += (my - y) * center_smoothness * self.scale
 
     def translate(self, delta: Vector):
         """Translate the transformation by the vector delta delta."""
-        self.translation += delta * self.scale
+        dx, dy = delta
+        self.tx += dx * self.scale
+        self.ty += dy * self.scale
 
     def zoom(self, position: Vector, delta: float):
         """Zoom in/out."""
@@ -150,4 +324,6 @@ class Transformation:
         self.scale *= 2 ** delta  # scale smoothly
 
         # adjust translation so the x and y of the mouse stay in the same spot
-        self.translation -= position * (self.scale - previous_scale)
+        x, y = position
+        self.tx -= x * (self.scale - previous_scale)
+        self.ty -= y * (self.scale - previous_scale)